@@ -5,31 +5,54 @@ Creates a sample image to test the rounded corners functionality
 """
 
 import sys
+import hashlib
 from pathlib import Path
-from PIL import Image, ImageDraw
-import time
 
-def create_demo_screenshot():
-    """Create a demo screenshot image"""
-    width, height = 1200, 800
+# Demo screenshot dimensions and content as (x0, y0, x1, y1, fill, outline,
+# outline_width), with inclusive pixel bounds like ImageDraw.rectangle
+WIDTH, HEIGHT = 1200, 800
+RECTS = (
+    (50, 50, WIDTH-50, HEIGHT-50, (0xff, 0xff, 0xff), (0xcc, 0xcc, 0xcc), 2),
+    (100, 100, WIDTH-100, 200, (0x00, 0x7a, 0xff), None, 0),
+    (100, 250, WIDTH-100, 350, (0x34, 0xc7, 0x59), None, 0),
+    (100, 400, WIDTH-100, 500, (0xff, 0x95, 0x00), None, 0),
+    # Text areas
+    (100, 550, WIDTH-100, 650, (0xf2, 0xf2, 0xf7), (0xd1, 0xd1, 0xd6), 1),
+    (100, 680, WIDTH-100, HEIGHT-100, (0xf2, 0xf2, 0xf7), (0xd1, 0xd1, 0xd6), 1),
+)
+
+# Content is deterministic, so key the cached file on it
+DEMO_KEY = hashlib.blake2b(repr((WIDTH, HEIGHT, RECTS)).encode(), digest_size=8).hexdigest()
+
+def build_demo_image():
+    """Build the demo screenshot in memory"""
+    # Imaging libraries are only needed when the image has to be (re)built
+    from PIL import Image
+    import numpy as np
     
-    # Create a sample screenshot-like image
-    img = Image.new('RGB', (width, height), '#f0f0f0')
-    draw = ImageDraw.Draw(img)
+    # Fill a single pixel buffer with slice writes instead of per-shape draw calls
+    arr = np.empty((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    arr[:] = (0xf0, 0xf0, 0xf0)
     
-    # Draw some sample content
-    draw.rectangle([50, 50, width-50, height-50], fill='#ffffff', outline='#cccccc', width=2)
-    draw.rectangle([100, 100, width-100, 200], fill='#007AFF')
-    draw.rectangle([100, 250, width-100, 350], fill='#34C759')
-    draw.rectangle([100, 400, width-100, 500], fill='#FF9500')
+    for x0, y0, x1, y1, fill, outline, w in RECTS:
+        arr[y0:y1+1, x0:x1+1] = fill
+        if outline:
+            arr[y0:y0+w, x0:x1+1] = outline
+            arr[y1-w+1:y1+1, x0:x1+1] = outline
+            arr[y0:y1+1, x0:x0+w] = outline
+            arr[y0:y1+1, x1-w+1:x1+1] = outline
     
-    # Add some text areas
-    draw.rectangle([100, 550, width-100, 650], fill='#F2F2F7', outline='#D1D1D6')
-    draw.rectangle([100, 680, width-100, height-100], fill='#F2F2F7', outline='#D1D1D6')
+    return Image.fromarray(arr)
+
+def create_demo_screenshot():
+    """Create a demo screenshot image, reusing a cached copy when present"""
+    demo_path = Path.cwd() / f'Demo_Screenshot_{DEMO_KEY}.png'
+    if demo_path.exists():
+        print(f"✅ Demo screenshot up to date: {demo_path}")
+        return demo_path
     
-    # Save as demo screenshot
-    demo_path = Path.cwd() / 'Demo_Screenshot.png'
-    img.save(demo_path, 'PNG')
+    # Save as demo screenshot (flat colors compress fine at zlib level 1)
+    build_demo_image().save(demo_path, 'PNG', compress_level=1)
     
     print(f"✅ Demo screenshot created: {demo_path}")
     return demo_path
@@ -41,12 +64,12 @@ def test_processing():
         
         print("🔄 Testing Screenshot Rounder...")
         
-        # Create demo image
-        demo_file = create_demo_screenshot()
+        # Build demo image in memory - no PNG round-trip through disk
+        demo_image = build_demo_image()
         
         # Process it
         app = ScreenshotRounder()
-        success = app.process_single_file(str(demo_file))
+        success = app.process_image(demo_image, 'Demo_Screenshot.png')
         
         if success:
             print("🎉 Demo processing completed successfully!")
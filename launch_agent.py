@@ -6,15 +6,24 @@ Creates a macOS LaunchAgent to run Screenshot Rounder automatically at startup
 
 import os
 import sys
+import asyncio
 from pathlib import Path
-import json
+from concurrent.futures import ThreadPoolExecutor
+import plistlib
+
+
+# Resolved once per invocation instead of at every call site
+_HOME = Path.home()
+_CWD = Path.cwd().resolve()
+_LA_DIR = _HOME / "Library" / "LaunchAgents"
+_PLIST = _LA_DIR / "com.screenshotrounder.agent.plist"
 
 
 def create_launch_agent():
     """Create macOS LaunchAgent plist file"""
     
     # Get current directory and script path
-    current_dir = Path.cwd().resolve()
+    current_dir = _CWD
     script_path = current_dir / "screenshot_rounder.py"
     config_path = current_dir / "config.json"
     
@@ -27,84 +36,65 @@ def create_launch_agent():
         return False
     
     # LaunchAgent directory
-    launch_agents_dir = Path.home() / "Library" / "LaunchAgents"
-    launch_agents_dir.mkdir(exist_ok=True)
-    
-    plist_file = launch_agents_dir / "com.screenshotrounder.agent.plist"
-    
-    # Create plist content
-    plist_content = f'''<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
-<plist version="1.0">
-<dict>
-    <key>Label</key>
-    <string>com.screenshotrounder.agent</string>
-    
-    <key>ProgramArguments</key>
-    <array>
-        <string>{current_dir}/venv/bin/python3</string>
-        <string>{script_path}</string>
-        <string>--config</string>
-        <string>{config_path}</string>
-    </array>
-    
-    <key>WorkingDirectory</key>
-    <string>{current_dir}</string>
-    
-    <key>RunAtLoad</key>
-    <true/>
-    
-    <key>KeepAlive</key>
-    <true/>
-    
-    <key>StandardOutPath</key>
-    <string>{Path.home()}/.screenshot_rounder/logs/launchd_stdout.log</string>
-    
-    <key>StandardErrorPath</key>
-    <string>{Path.home()}/.screenshot_rounder/logs/launchd_stderr.log</string>
-    
-    <key>ProcessType</key>
-    <string>Background</string>
-    
-    <key>LowPriorityIO</key>
-    <true/>
-    
-    <key>Nice</key>
-    <integer>1</integer>
-</dict>
-</plist>'''
-    
-    # Write plist file
+    _LA_DIR.mkdir(exist_ok=True)
+    
+    plist_file = _PLIST
+    
+    logs_dir = _HOME / ".screenshot_rounder" / "logs"
+    
+    # Create plist content (plistlib handles XML escaping)
+    plist_content = plistlib.dumps({
+        "Label": "com.screenshotrounder.agent",
+        "ProgramArguments": [
+            f"{current_dir}/venv/bin/python3",
+            str(script_path),
+            "--config",
+            str(config_path),
+        ],
+        "WorkingDirectory": str(current_dir),
+        "RunAtLoad": True,
+        "KeepAlive": {"SuccessfulExit": False, "Crashed": True},
+        "ThrottleInterval": 10,
+        "StandardOutPath": str(logs_dir / "launchd_stdout.log"),
+        "StandardErrorPath": str(logs_dir / "launchd_stderr.log"),
+        "ProcessType": "Adaptive",
+    }, fmt=plistlib.FMT_XML)
+    
+    # Write plist file atomically so launchd never sees a partial plist
     try:
-        with open(plist_file, 'w') as f:
-            f.write(plist_content)
+        tmp_file = plist_file.with_suffix('.plist.tmp')
+        # launchd won't create the log directory for StandardOutPath/StandardErrorPath,
+        # so create it alongside the plist write
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            logs_future = executor.submit(logs_dir.mkdir, parents=True, exist_ok=True)
+            plist_future = executor.submit(tmp_file.write_bytes, plist_content)
+            logs_future.result()
+            plist_future.result()
+        
+        os.replace(tmp_file, plist_file)
         
         print(f"✅ LaunchAgent created: {plist_file}")
         
-        # Load the launch agent
+        # Load the launch agent (bootstrap also starts RunAtLoad jobs)
         import subprocess
         result = subprocess.run(
-            ["launchctl", "load", "-w", str(plist_file)],
+            ["launchctl", "bootstrap", f"gui/{os.getuid()}", str(plist_file)],
             capture_output=True,
             text=True
         )
         
-        if result.returncode == 0:
-            print(f"✅ LaunchAgent loaded successfully")
-            print(f"🎯 Screenshot Rounder will now start automatically at login")
-            
-            # Start it now
-            start_result = subprocess.run(
-                ["launchctl", "start", "com.screenshotrounder.agent"],
+        if result.returncode != 0:
+            # Older macOS without bootstrap support
+            result = subprocess.run(
+                ["launchctl", "load", "-w", str(plist_file)],
                 capture_output=True,
                 text=True
             )
-            
-            if start_result.returncode == 0:
-                print(f"✅ Screenshot Rounder started")
-            else:
-                print(f"⚠️  Could not start now, but will start at next login")
-                
+        
+        if result.returncode == 0:
+            print(f"✅ LaunchAgent loaded successfully")
+            print(f"🎯 Screenshot Rounder will now start automatically at login")
+            print(f"🚀 Screenshot Rounder will start now (RunAtLoad)")
         else:
             print(f"❌ Failed to load LaunchAgent: {result.stderr}")
             return False
@@ -116,34 +106,54 @@ def create_launch_agent():
         return False
 
 
+async def _run_launchctl(*args):
+    """Run launchctl asynchronously and return its exit code"""
+    proc = await asyncio.create_subprocess_exec(
+        "launchctl", *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    await proc.communicate()
+    return proc.returncode
+
+
+async def _bootout():
+    """Unload the agent by label (no plist needed); returns launchctl's exit code"""
+    returncode = await _run_launchctl("bootout", f"gui/{os.getuid()}/com.screenshotrounder.agent")
+    if returncode != 0:
+        # Older macOS without bootout support
+        returncode = await _run_launchctl("remove", "com.screenshotrounder.agent")
+    return returncode
+
+
 def remove_launch_agent():
     """Remove the LaunchAgent"""
-    launch_agents_dir = Path.home() / "Library" / "LaunchAgents"
-    plist_file = launch_agents_dir / "com.screenshotrounder.agent.plist"
+    plist_file = _PLIST
     
     if not plist_file.exists():
         print(f"⚠️  LaunchAgent not found: {plist_file}")
         return True
     
+    # Unload first, then delete the plist - each outcome reported on its own
     try:
-        import subprocess
-        
-        # Unload the agent
-        result = subprocess.run(
-            ["launchctl", "unload", "-w", str(plist_file)],
-            capture_output=True,
-            text=True
-        )
-        
-        # Remove the file
-        plist_file.unlink()
-        
-        print(f"✅ LaunchAgent removed successfully")
-        return True
-        
+        returncode = asyncio.run(_bootout())
     except Exception as e:
-        print(f"❌ Error removing LaunchAgent: {e}")
+        returncode = None
+        print(f"⚠️  Could not run launchctl: {e}")
+    
+    if returncode == 0:
+        print(f"✅ LaunchAgent unloaded")
+    elif returncode is not None:
+        print(f"⚠️  LaunchAgent was not unloaded (exit code {returncode}) - it may not have been loaded")
+    
+    try:
+        plist_file.unlink()
+    except OSError as e:
+        print(f"❌ Error removing LaunchAgent plist: {e}")
         return False
+    
+    print(f"✅ LaunchAgent removed successfully")
+    return True
 
 
 def main():
@@ -172,22 +182,32 @@ def main():
         sys.exit(0 if success else 1)
         
     elif args.action == 'status':
-        launch_agents_dir = Path.home() / "Library" / "LaunchAgents"
-        plist_file = launch_agents_dir / "com.screenshotrounder.agent.plist"
+        plist_file = _PLIST
         
         if plist_file.exists():
             print("✅ Launch Agent is installed")
             
-            # Check if it's loaded
+            # Check if it's loaded - one spawn gives state, PID and last exit
             import subprocess
             result = subprocess.run(
-                ["launchctl", "list", "com.screenshotrounder.agent"],
+                ["launchctl", "print", f"gui/{os.getuid()}/com.screenshotrounder.agent"],
                 capture_output=True,
                 text=True
             )
             
             if result.returncode == 0:
-                print("✅ Launch Agent is loaded and running")
+                info = {}
+                for line in result.stdout.splitlines():
+                    key, sep, value = line.strip().partition(" = ")
+                    if sep and key in ("state", "pid", "last exit code"):
+                        info.setdefault(key, value)
+                
+                if info.get("state") == "running":
+                    print(f"✅ Launch Agent is loaded and running (PID {info.get('pid', '?')})")
+                else:
+                    print(f"⚠️  Launch Agent is loaded but not running "
+                          f"(state: {info.get('state', 'unknown')}, "
+                          f"last exit code: {info.get('last exit code', 'n/a')})")
             else:
                 print("⚠️  Launch Agent is installed but not loaded")
         else:
@@ -10,17 +10,29 @@ import sys
 import json
 import time
 import logging
-import tempfile
-from pathlib import Path
-from typing import Optional, Tuple
+import logging.handlers
+import queue
+import atexit
+import signal
+import io
+import hashlib
+import re
 import fnmatch
+from pathlib import Path
+from typing import Optional, Set, Tuple
 from datetime import datetime
 import threading
+import functools
 
 # Third-party imports
-from PIL import Image, ImageDraw
-from watchdog.observers import Observer
+from PIL import Image
+import numpy as np
 from watchdog.events import FileSystemEventHandler
+try:
+    # Native FSEvents backend on macOS
+    from watchdog.observers.fsevents import FSEventsObserver as Observer
+except ImportError:
+    from watchdog.observers import Observer
 try:
     import AppKit
     from AppKit import NSPasteboard, NSPasteboardTypePNG
@@ -28,6 +40,25 @@ try:
 except ImportError:
     CLIPBOARD_AVAILABLE = False
     print("⚠️  Clipboard functionality not available. Install pyobjc-framework-Cocoa for clipboard support.")
+try:
+    # Optional faster PNG encoder; Pillow is used when libvips isn't installed
+    import pyvips
+    PYVIPS_AVAILABLE = True
+except (ImportError, OSError):
+    PYVIPS_AVAILABLE = False
+
+
+# Background log listener, shared by every config in this process
+_log_listener = None
+
+
+def _exit_on_sigterm():
+    """Exit normally on SIGTERM (launchd stopping the agent) so atexit flushes the log queue"""
+    if threading.current_thread() is not threading.main_thread():
+        return
+    if signal.getsignal(signal.SIGTERM) is not signal.SIG_DFL:
+        return
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
 
 
 # ------------------------------------------------- #
@@ -74,7 +105,8 @@ class ScreenshotRounderConfig:
             "monitor_enabled": True,
             "log_level": "INFO",
             "file_patterns": ["Screenshot*.png", "CleanShot*.png", "Screen Shot*.png"],
-            "processing_delay": 0.5
+            "processing_delay": 0.5,
+            "png_compress_level": 1
         }
     
     def setup_logging(self):
@@ -88,15 +120,29 @@ class ScreenshotRounderConfig:
         # Setup file handler
         log_file = log_dir / f"screenshot_rounder_{datetime.now().strftime('%Y%m%d')}.log"
         
-        # Configure logging
-        logging.basicConfig(
-            level=log_level,
-            format='%(asctime)s | %(levelname)s | %(funcName)s:%(lineno)d | %(message)s',
-            handlers=[
-                logging.FileHandler(log_file),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
+        # One listener per process - later configs reuse it instead of opening
+        # another file handler that basicConfig would never attach
+        global _log_listener
+        if _log_listener is None:
+            # Configure logging - file writes go through a background listener;
+            # the console stays synchronous so it lines up with print() output
+            formatter = logging.Formatter('%(asctime)s | %(levelname)s | %(funcName)s:%(lineno)d | %(message)s')
+            file_handler = logging.FileHandler(log_file)
+            stream_handler = logging.StreamHandler(sys.stdout)
+            file_handler.setFormatter(formatter)
+            stream_handler.setFormatter(formatter)
+            
+            log_queue = queue.SimpleQueue()
+            queue_handler = logging.handlers.QueueHandler(log_queue)
+            queue_handler.setFormatter(logging.Formatter('%(message)s'))  # Final layout applied by listener
+            logging.basicConfig(level=log_level, handlers=[queue_handler, stream_handler])
+            
+            _log_listener = logging.handlers.QueueListener(log_queue, file_handler)
+            _log_listener.start()
+            atexit.register(_log_listener.stop)  # Flush queued records on exit
+            _exit_on_sigterm()
+        
+        self.log_listener = _log_listener
         
         self.logger = logging.getLogger(__name__)
         self.logger.info(f"🚀 Screenshot Rounder initialized - Log Level: {self.config.get('log_level', 'INFO')}")
@@ -115,126 +161,240 @@ class ScreenshotRounderConfig:
 #                                                   #
 # ------------------------------------------------- #
 
+# Quarter-disc corners persisted across runs, one small .npy per radius
+MASK_CACHE_DIR = Path.home() / '.screenshot_rounder' / 'masks'
+
+
+@functools.lru_cache(maxsize=8)
+def _build_corner(radius: int) -> np.ndarray:
+    """Load or build the anti-aliased top-left quarter-disc alpha for a corner radius"""
+    cache_file = MASK_CACHE_DIR / f"corner_r{radius}.npy"
+    
+    try:
+        corner = np.load(cache_file, mmap_mode='r')
+        if corner.shape == (radius, radius) and corner.dtype == np.uint8:
+            return corner
+    except (OSError, ValueError):
+        pass  # Not cached yet (or unreadable) - rebuild below
+    
+    # Distance from each pixel center to the circle center at (radius, radius)
+    yy, xx = np.ogrid[:radius, :radius]
+    dist = np.hypot(radius - xx - 0.5, radius - yy - 0.5)
+    coverage = np.clip(radius - dist + 0.5, 0.0, 1.0)
+    corner = np.rint(coverage * 255).astype(np.uint8)
+    
+    # Best effort: write to a temp file and rename so readers never see a partial file
+    try:
+        MASK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        temp_file = cache_file.with_suffix('.tmp')
+        with open(temp_file, 'wb') as f:
+            np.save(f, corner)
+        os.replace(temp_file, cache_file)
+    except OSError:
+        pass
+    
+    return corner
+
+
+def _apply_rounded_corners(alpha: np.ndarray, radius: int) -> None:
+    """Round the corners of an alpha plane in place"""
+    # Only the four r x r corners need per-pixel work; the rest of the image
+    # keeps its alpha, so no full-size mask is built or kept around
+    height, width = alpha.shape
+    radius = min(radius, width // 2, height // 2)
+    if radius <= 0:
+        return
+    
+    corner = _build_corner(radius)
+    for rows, cols, view in (
+        (slice(None, radius), slice(None, radius), corner),
+        (slice(None, radius), slice(-radius, None), corner[:, ::-1]),
+        (slice(-radius, None), slice(None, radius), corner[::-1, :]),
+        (slice(-radius, None), slice(-radius, None), corner[::-1, ::-1]),
+    ):
+        # Minimum keeps any existing alpha (e.g. window shadows)
+        np.minimum(alpha[rows, cols], view, out=alpha[rows, cols])
+
+
 class ImageProcessor:
     """Handles all image processing operations"""
     
     def __init__(self, config: ScreenshotRounderConfig):
         self.config = config
         self.logger = logging.getLogger(__name__)
+        self.images_processed = 0
+        self.images_converted = 0
+        
+        # Resolve settings once instead of per image
+        settings = config.config
+        self._use_percentage = bool(settings.get('use_percentage', True))
+        self._radius_pct = float(settings.get('corner_radius_percentage', 0.05))
+        self._fixed_radius = int(settings.get('corner_radius', 20))
+        self._compress_level = int(settings.get('png_compress_level', 1))
+        self._save_to_desktop = bool(settings.get('save_to_desktop', True))
+        self._replace_original = bool(settings.get('replace_original', False))
+        self._output_dir = config.get_expanded_path(settings.get('output_folder', '~/Desktop/rounded_screenshots'))
         
     def calculate_corner_radius(self, image_size: Tuple[int, int]) -> int:
         """Calculate corner radius based on configuration"""
         width, height = image_size
         
-        if self.config.config.get('use_percentage', True):
+        if self._use_percentage:
             # Use percentage of smallest dimension
             min_dimension = min(width, height)
-            radius = int(min_dimension * self.config.config.get('corner_radius_percentage', 0.05))
-            self.logger.debug(f"📐 Calculated radius from percentage: {radius}px (min_dim: {min_dimension}px, percentage: {self.config.config.get('corner_radius_percentage', 0.05)})")
+            radius = int(min_dimension * self._radius_pct)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"📐 Calculated radius from percentage: {radius}px (min_dim: {min_dimension}px, percentage: {self._radius_pct})")
         else:
             # Use fixed pixel value
-            radius = self.config.config.get('corner_radius', 20)
-            self.logger.debug(f"📐 Using fixed radius: {radius}px")
+            radius = self._fixed_radius
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"📐 Using fixed radius: {radius}px")
             
         return max(1, radius)  # Ensure minimum radius of 1
     
-    def create_rounded_mask(self, size: Tuple[int, int], radius: int) -> Image.Image:
-        """Create a rounded rectangle mask"""
-        width, height = size
-        self.logger.debug(f"🎭 Creating rounded mask: {width}x{height} with radius {radius}px")
-        
-        # Create mask with rounded corners
-        mask = Image.new('L', size, 0)
-        draw = ImageDraw.Draw(mask)
+    def apply_rounded_mask(self, pixels: np.ndarray, radius: int) -> None:
+        """Apply the rounded corner mask to an RGBA/LA pixel array in place"""
+        height, width = pixels.shape[:2]
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"🎭 Rounding corners: {width}x{height} with radius {radius}px "
+                              f"(corner cache: {_build_corner.cache_info()})")
+        
+        _apply_rounded_corners(pixels[..., -1], radius)
+    
+    def apply_rounded_corners(self, image_path: Path) -> Tuple[Optional[Path], Optional[bytes]]:
+        """Apply rounded corners to an image file, returning (output_path, png_bytes)"""
+        try:
+            # ------------------------------- #
+            #  Load and Validate Image        #
+            # ------------------------------- #
+            
+            with Image.open(image_path) as img:
+                # A 1px radius is invisible - skip the decode/mask/encode cycle
+                # and hand the original PNG on unchanged
+                radius = self.calculate_corner_radius(img.size)
+                if img.format == 'PNG' and radius <= 1:
+                    return self.pass_through(image_path)
+                
+                return self.process_image(img, image_path, radius)
+                
+        except Exception as e:
+            self.logger.error(f"❌ Error processing image {image_path}: {str(e)}")
+            return None, None
+    
+    def pass_through(self, image_path: Path) -> Tuple[Optional[Path], Optional[bytes]]:
+        """Pass an image file on unchanged, returning (output_path, png_bytes)"""
+        self.logger.info(f"⏭️  Corner radius too small to matter, passing through: {image_path.name}")
+        png_bytes = image_path.read_bytes()
         
-        # Draw rounded rectangle
-        draw.rounded_rectangle(
-            [(0, 0), (width - 1, height - 1)],
-            radius=radius,
-            fill=255
-        )
+        output_path = self.get_output_path(image_path)
+        if output_path and output_path != image_path:
+            output_path.write_bytes(png_bytes)
+            self.logger.info(f"💾 Saved to: {output_path}")
         
-        self.logger.debug(f"✅ Rounded mask created successfully")
-        return mask
+        return output_path, png_bytes
     
-    def apply_rounded_corners(self, image_path: Path) -> Optional[Path]:
-        """Apply rounded corners to an image"""
+    def process_image(self, img: Image.Image, image_path: Path,
+                      radius: Optional[int] = None, save: bool = True) -> Tuple[Optional[Path], Optional[bytes]]:
+        """Apply rounded corners to an in-memory image, naming the output after image_path
+        
+        Pass `radius` if it was already calculated for this image; `save=False`
+        only encodes the PNG bytes without writing a file.
+        Returns (output_path, png_bytes); output_path is None in clipboard-only mode.
+        """
         try:
             self.logger.info(f"🔄 Processing image: {image_path.name}")
             start_time = time.time()
             
+            # Image.open only parses the header, so size is known before the
+            # pixel data is decoded
+            original_size = img.size
+            self.logger.info(f"📸 Image opened: {original_size[0]}x{original_size[1]} pixels")
+            
             # ------------------------------- #
-            #  Load and Validate Image        #
+            #  Calculate Corner Radius        #
             # ------------------------------- #
             
-            with Image.open(image_path) as img:
-                # Convert to RGBA if needed
-                if img.mode != 'RGBA':
-                    img = img.convert('RGBA')
-                    self.logger.debug(f"🔄 Converted image to RGBA mode")
-                
-                original_size = img.size
-                self.logger.info(f"📸 Image loaded: {original_size[0]}x{original_size[1]} pixels")
-                
-                # ------------------------------- #
-                #  Calculate Corner Radius        #
-                # ------------------------------- #
-                
+            if radius is None:
                 radius = self.calculate_corner_radius(original_size)
-                self.logger.info(f"📐 Using corner radius: {radius}px")
-                
-                # ------------------------------- #
-                #  Create and Apply Mask          #
-                # ------------------------------- #
-                
-                mask = self.create_rounded_mask(original_size, radius)
-                
-                # Apply mask to create transparency
-                img.putalpha(mask)
-                self.logger.debug(f"🎭 Applied rounded corner mask")
-                
-                # ------------------------------- #
-                #  Save Processed Image           #
-                # ------------------------------- #
-                
-                output_path = self.get_output_path(image_path)
-                
-                if output_path:
-                    # Save to file
-                    img.save(output_path, 'PNG', optimize=True)
-                    self.logger.info(f"💾 Saved to: {output_path}")
-                else:
-                    # Only clipboard mode - save to temp for clipboard
-                    temp_file = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-                    temp_path = Path(temp_file.name)
-                    img.save(temp_path, 'PNG', optimize=True)
-                    temp_file.close()
-                    output_path = temp_path
-                    self.logger.debug(f"📋 Saved to temp for clipboard: {temp_path}")
-                
-                processing_time = time.time() - start_time
-                self.logger.info(f"✅ Image processed successfully in {processing_time:.2f}s")
-                
-                return output_path
-                
+            self.logger.info(f"📐 Using corner radius: {radius}px")
+            
+            # ------------------------------- #
+            #  Create and Apply Mask          #
+            # ------------------------------- #
+            
+            # Decode once; images that already carry alpha (macOS screenshots are
+            # RGBA) are masked directly without an extra conversion copy
+            img.load()
+            self.images_processed += 1
+            if img.mode not in ('RGBA', 'LA'):
+                source_mode = img.mode
+                img = img.convert('RGBA')
+                self.images_converted += 1
+                self.logger.debug(f"🔄 Converted {source_mode} image to RGBA mode "
+                                  f"({self.images_converted}/{self.images_processed} images needed conversion)")
+            
+            # Apply mask to the corners to create transparency
+            pixels = np.array(img)
+            self.apply_rounded_mask(pixels, radius)
+            self.logger.debug(f"🎭 Applied rounded corner mask")
+            
+            # ------------------------------- #
+            #  Save Processed Image           #
+            # ------------------------------- #
+            
+            # Encode once; the same bytes go to disk and to the clipboard
+            png_bytes = self.encode_png(pixels)
+            
+            output_path = self.get_output_path(image_path) if save else None
+            
+            if output_path:
+                # Save to file
+                output_path.write_bytes(png_bytes)
+                self.logger.info(f"💾 Saved to: {output_path}")
+            elif self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"📋 Clipboard-only mode - kept {len(png_bytes)} bytes in memory")
+            
+            processing_time = time.time() - start_time
+            self.logger.info(f"✅ Image processed successfully in {processing_time:.2f}s")
+            
+            return output_path, png_bytes
+            
         except Exception as e:
             self.logger.error(f"❌ Error processing image {image_path}: {str(e)}")
-            return None
+            return None, None
+    
+    def encode_png(self, pixels: np.ndarray) -> bytes:
+        """Encode an RGBA/LA pixel array as PNG, via pyvips when available"""
+        if PYVIPS_AVAILABLE:
+            height, width, bands = pixels.shape
+            vips_image = pyvips.Image.new_from_memory(pixels.data, width, height, bands, 'uchar')
+            self.logger.debug(f"🖼️  Encoding PNG with pyvips")
+            return vips_image.pngsave_buffer(compression=self._compress_level)
+        
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(
+            buffer, 'PNG',
+            compress_level=self._compress_level,
+            optimize=False
+        )
+        return buffer.getvalue()
     
     def get_output_path(self, input_path: Path) -> Optional[Path]:
         """Determine output path for processed image"""
         
         # Check if desktop saving is disabled
-        if not self.config.config.get('save_to_desktop', True):
+        if not self._save_to_desktop:
             self.logger.debug(f"📝 Desktop saving disabled - only clipboard mode")
             return None
             
-        if self.config.config.get('replace_original', False):
+        if self._replace_original:
             output_path = input_path
-            self.logger.debug(f"📝 Will replace original file: {output_path}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"📝 Will replace original file: {output_path}")
         else:
             # Create output directory
-            output_dir = self.config.get_expanded_path(self.config.config.get('output_folder', '~/Desktop/rounded_screenshots'))
+            output_dir = self._output_dir
             output_dir.mkdir(parents=True, exist_ok=True)
             
             # Generate output filename
@@ -242,8 +402,9 @@ class ImageProcessor:
             suffix = input_path.suffix
             output_path = output_dir / f"{stem}_rounded{suffix}"
             
-            self.logger.debug(f"📁 Output directory: {output_dir}")
-            self.logger.debug(f"📝 Output filename: {output_path.name}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"📁 Output directory: {output_dir}")
+                self.logger.debug(f"📝 Output filename: {output_path.name}")
         
         return output_path
 
@@ -263,25 +424,24 @@ class ClipboardManager:
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.clipboard_available = CLIPBOARD_AVAILABLE
-        self.last_clipboard_content = None
-        self.clipboard_monitor_thread = None
+        self._last_clipboard_hash = None  # digest only - never keep the PNG itself
         self.monitoring_clipboard = False
+        self._stop_event = threading.Event()  # Wakes the polling loop on stop
+        self._last_change_count = None
         
         if not self.clipboard_available:
             self.logger.warning("⚠️  Clipboard functionality not available - install pyobjc-framework-Cocoa")
+        else:
+            self._last_change_count = NSPasteboard.generalPasteboard().changeCount()
     
-    def copy_image_to_clipboard(self, image_path: Path) -> bool:
-        """Copy processed image to clipboard"""
+    def copy_image_to_clipboard(self, image_data: bytes) -> bool:
+        """Copy processed PNG data to clipboard"""
         if not self.clipboard_available:
             self.logger.warning("⚠️  Cannot copy to clipboard - PyObjC not available")
             return False
             
         try:
-            self.logger.info(f"📋 Copying to clipboard: {image_path.name}")
-            
-            # Read image data
-            with open(image_path, 'rb') as f:
-                image_data = f.read()
+            self.logger.info(f"📋 Copying to clipboard: {len(image_data)} bytes")
             
             # Get pasteboard and clear it
             pasteboard = NSPasteboard.generalPasteboard()
@@ -292,6 +452,8 @@ class ClipboardManager:
             success = pasteboard.setData_forType_(ns_data, NSPasteboardTypePNG)
             
             if success:
+                # Our own write bumps changeCount; don't treat it as a new selection
+                self._last_change_count = pasteboard.changeCount()
                 self.logger.info(f"✅ Image copied to clipboard successfully")
                 return True
             else:
@@ -319,8 +481,8 @@ class ClipboardManager:
             self.logger.debug(f"❌ Error reading clipboard: {str(e)}")
             return None
     
-    def start_clipboard_monitoring(self, processor: 'ImageProcessor'):
-        """Start monitoring clipboard for new images"""
+    def run_clipboard_monitoring(self, processor: 'ImageProcessor'):
+        """Monitor clipboard for new images on the calling thread until stopped"""
         if not self.clipboard_available:
             self.logger.warning("⚠️  Cannot monitor clipboard - PyObjC not available")
             return
@@ -330,79 +492,65 @@ class ClipboardManager:
             return
             
         self.monitoring_clipboard = True
-        self.clipboard_monitor_thread = threading.Thread(
-            target=self._monitor_clipboard_loop,
-            args=(processor,),
-            daemon=True
-        )
-        self.clipboard_monitor_thread.start()
+        self._stop_event.clear()
         self.logger.info("📋 Started clipboard monitoring for Cmd+Shift+4 selections")
+        self._monitor_clipboard_loop(processor)
     
     def stop_clipboard_monitoring(self):
         """Stop clipboard monitoring"""
         self.monitoring_clipboard = False
-        if self.clipboard_monitor_thread:
-            self.clipboard_monitor_thread.join(timeout=1)
+        self._stop_event.set()
         self.logger.info("📋 Stopped clipboard monitoring")
     
     def _monitor_clipboard_loop(self, processor: 'ImageProcessor'):
         """Monitor clipboard for new images in a loop"""
         self.logger.debug("📋 Clipboard monitoring loop started")
+        pasteboard = NSPasteboard.generalPasteboard()
         
         while self.monitoring_clipboard:
             try:
+                # changeCount only moves on real clipboard writes - skip reading
+                # PNG data while it is unchanged
+                change_count = pasteboard.changeCount()
+                if change_count == self._last_change_count:
+                    self._stop_event.wait(0.5)
+                    continue
+                self._last_change_count = change_count
+                
                 # Check for new clipboard content
                 current_content = self.get_clipboard_image()
+                current_hash = (
+                    hashlib.blake2b(current_content, digest_size=16).digest()
+                    if current_content else None
+                )
                 
-                if current_content and current_content != self.last_clipboard_content:
+                if current_hash and current_hash != self._last_clipboard_hash:
                     self.logger.info("📋 New image detected in clipboard (Cmd+Shift+4 selection)")
                     
-                    # Save clipboard image to temp file
-                    temp_path = self._save_clipboard_to_temp(current_content)
-                    if temp_path:
-                        # Process the image
-                        output_path = processor.apply_rounded_corners(temp_path)
-                        if output_path:
-                            self.logger.info(f"✅ Clipboard image processed: {output_path.name}")
-                            # Copy back to clipboard
-                            self.copy_image_to_clipboard(output_path)
+                    # Decode straight from the pasteboard bytes - no temp file
+                    with Image.open(io.BytesIO(current_content)) as img:
+                        radius = processor.calculate_corner_radius(img.size)
+                        if radius <= 1:
+                            # Invisible rounding - the clipboard already holds
+                            # the image as it would come out
+                            self.logger.info("⏭️  Corner radius too small to matter, leaving clipboard as is")
                         else:
-                            self.logger.error("❌ Failed to process clipboard image")
-                        
-                        # Clean up temp files
-                        temp_path.unlink(missing_ok=True)
-                        if output_path and output_path != temp_path:
-                            output_path.unlink(missing_ok=True)
+                            # The result only goes back to the clipboard - skip the file write
+                            _, png_bytes = processor.process_image(img, Path("clipboard.png"), radius, save=False)
+                            if png_bytes:
+                                self.logger.info(f"✅ Clipboard image processed")
+                                # Copy back to clipboard
+                                self.copy_image_to_clipboard(png_bytes)
+                            else:
+                                self.logger.error("❌ Failed to process clipboard image")
                     
-                    self.last_clipboard_content = current_content
+                    self._last_clipboard_hash = current_hash
                 
-                time.sleep(0.5)  # Check every 500ms
+                self._stop_event.wait(0.5)  # Check every 500ms, return early on stop
                 
             except Exception as e:
                 self.logger.error(f"❌ Error in clipboard monitoring: {str(e)}")
-                time.sleep(1)
-    
-    def _save_clipboard_to_temp(self, image_data: bytes) -> Optional[Path]:
-        """Save clipboard image data to temporary file"""
-        try:
-            # Create temp file
-            temp_file = tempfile.NamedTemporaryFile(
-                suffix='.png',
-                prefix='clipboard_',
-                delete=False
-            )
-            temp_path = Path(temp_file.name)
-            
-            # Write image data
-            temp_file.write(image_data)
-            temp_file.close()
-            
-            self.logger.debug(f"📋 Saved clipboard image to temp: {temp_path}")
-            return temp_path
-            
-        except Exception as e:
-            self.logger.error(f"❌ Error saving clipboard to temp: {str(e)}")
-            return None
+                self._stop_event.wait(1)
 
 
 # ------------------------------------------------- #
@@ -416,83 +564,119 @@ class ClipboardManager:
 class ScreenshotHandler(FileSystemEventHandler):
     """Handles file system events for new screenshots"""
     
-    def __init__(self, config: ScreenshotRounderConfig):
+    def __init__(self, config: ScreenshotRounderConfig, processor: ImageProcessor,
+                 clipboard: ClipboardManager):
+        # Resolve settings once instead of per event
+        self._file_patterns = tuple(config.config.get('file_patterns', []))
+        self._processing_delay = config.config.get('processing_delay', 0.5)
+        self._auto_copy = config.config.get('auto_copy_to_clipboard', True)
+        
         super().__init__()
+        
+        # All globs compiled into one regex, so each event costs a single match
+        # (an empty pattern list matches nothing)
+        self._pattern_re = re.compile(
+            '|'.join(f'(?:{fnmatch.translate(p)})' for p in self._file_patterns) or '(?!)'
+        )
         self.config = config
         self.logger = logging.getLogger(__name__)
-        self.processor = ImageProcessor(config)
-        self.clipboard = ClipboardManager(config)
-        self.processing_files = set()  # Track files being processed
+        self.processor = processor
+        self.clipboard = clipboard
+        self.processing_files: Set[int] = set()  # Inodes of files being processed
+        self._processing_lock = threading.Lock()
         
         self.logger.info(f"🔍 Screenshot handler initialized")
         self.logger.info(f"📁 Monitoring folder: {config.get_expanded_path(config.config['screenshot_folder'])}")
-        self.logger.info(f"🎯 File patterns: {config.config.get('file_patterns', [])}")
+        self.logger.info(f"🎯 File patterns: {list(self._file_patterns)}")
     
-    def on_created(self, event):
-        """Handle new file creation"""
-        if event.is_directory:
+    def dispatch(self, event):
+        """Drop directory and non-screenshot events before any handler runs"""
+        if event.is_directory or not self.is_screenshot_file(event.src_path):
             return
-            
+        super().dispatch(event)
+    
+    def is_screenshot_file(self, file_path: str) -> bool:
+        """Check if a file name matches the screenshot patterns"""
+        return self._pattern_re.match(os.path.basename(file_path)) is not None
+    
+    def on_created(self, event):
+        """Handle new screenshot creation (already filtered by file_patterns)"""
         file_path = Path(event.src_path)
-        self.logger.debug(f"📁 New file detected: {file_path.name}")
+        self.logger.info(f"📸 Screenshot detected: {file_path.name}")
+        
+        # Ensure file is completely written before processing
+        if not self.wait_for_stable_file(file_path):
+            self.logger.warning(f"⚠️  File disappeared before processing: {file_path.name}")
+            return
         
-        # Check if it matches screenshot patterns
-        if self.is_screenshot_file(file_path):
-            self.logger.info(f"📸 Screenshot detected: {file_path.name}")
+        self.process_screenshot(file_path)
+    
+    def wait_for_stable_file(self, file_path: Path, interval: float = 0.02,
+                             settle: float = 0.1) -> bool:
+        """Wait until the file stops changing for `settle` seconds, for at most processing_delay seconds"""
+        deadline = time.monotonic() + self._processing_delay
+        last_state = None
+        stable_since = None
+        
+        while True:
+            try:
+                st = file_path.stat()
+            except FileNotFoundError:
+                return False
             
-            # Add delay to ensure file is completely written
-            delay = self.config.config.get('processing_delay', 0.5)
-            if delay > 0:
-                self.logger.debug(f"⏳ Waiting {delay}s for file to complete...")
-                time.sleep(delay)
+            # Size and mtime both have to hold still - a writer that pauses
+            # briefly must not be mistaken for a finished one
+            state = (st.st_size, st.st_mtime_ns)
+            now = time.monotonic()
+            if state != last_state or st.st_size == 0:
+                last_state = state
+                stable_since = now
+            elif now - stable_since >= settle:
+                self.logger.debug(f"✅ File size stable at {st.st_size} bytes: {file_path.name}")
+                return True
             
-            self.process_screenshot(file_path)
-    
-    def is_screenshot_file(self, file_path: Path) -> bool:
-        """Check if file matches screenshot patterns"""
-        patterns = self.config.config.get('file_patterns', [])
-        filename = file_path.name
-        
-        for pattern in patterns:
-            if fnmatch.fnmatch(filename, pattern):
-                self.logger.debug(f"✅ File matches pattern '{pattern}': {filename}")
+            if now >= deadline:
+                self.logger.debug(f"⏳ Stopped waiting after {self._processing_delay}s: {file_path.name}")
                 return True
-        
-        self.logger.debug(f"❌ File doesn't match any pattern: {filename}")
-        return False
+            
+            time.sleep(interval)
     
     def process_screenshot(self, file_path: Path):
         """Process a screenshot file"""
-        # Prevent duplicate processing
-        if str(file_path) in self.processing_files:
-            self.logger.debug(f"⏭️  File already being processed: {file_path.name}")
+        # ------------------------------- #
+        #  Validate File Exists           #
+        # ------------------------------- #
+        
+        # Key by inode: an integer compare, and stable if macOS renames the file
+        try:
+            file_key = file_path.stat().st_ino
+        except OSError:
+            self.logger.warning(f"⚠️  File no longer exists: {file_path}")
             return
+        
+        # Prevent duplicate processing
+        with self._processing_lock:
+            if file_key in self.processing_files:
+                self.logger.debug(f"⏭️  File already being processed: {file_path.name}")
+                return
+            self.processing_files.add(file_key)
             
         try:
-            self.processing_files.add(str(file_path))
             self.logger.info(f"🔄 Starting processing: {file_path.name}")
             
-            # ------------------------------- #
-            #  Validate File Exists           #
-            # ------------------------------- #
-            
-            if not file_path.exists():
-                self.logger.warning(f"⚠️  File no longer exists: {file_path}")
-                return
-            
             # ------------------------------- #
             #  Process Image                  #
             # ------------------------------- #
             
-            output_path = self.processor.apply_rounded_corners(file_path)
+            _, png_bytes = self.processor.apply_rounded_corners(file_path)
             
-            if output_path:
+            if png_bytes:
                 # ------------------------------- #
                 #  Copy to Clipboard              #
                 # ------------------------------- #
                 
-                if self.config.config.get('auto_copy_to_clipboard', True):
-                    self.clipboard.copy_image_to_clipboard(output_path)
+                if self._auto_copy:
+                    self.clipboard.copy_image_to_clipboard(png_bytes)
                 
                 self.logger.info(f"🎉 Screenshot processing completed: {file_path.name}")
             else:
@@ -501,7 +685,8 @@ class ScreenshotHandler(FileSystemEventHandler):
         except Exception as e:
             self.logger.error(f"❌ Error processing screenshot {file_path}: {str(e)}")
         finally:
-            self.processing_files.discard(str(file_path))
+            with self._processing_lock:
+                self.processing_files.discard(file_key)
 
 
 # ------------------------------------------------- #
@@ -521,6 +706,10 @@ class ScreenshotRounder:
         self.observer = None
         self.handler = None
         
+        # Shared by the file watcher, clipboard monitor and manual processing
+        self.processor = ImageProcessor(self.config)
+        self.clipboard = ClipboardManager(self.config)
+        
         self.logger.info(f"🚀 Screenshot Rounder starting up...")
         self.validate_setup()
     
@@ -576,7 +765,7 @@ class ScreenshotRounder:
         self.logger.info(f"📁 Watching folder: {screenshot_folder}")
         
         # Setup file handler and observer
-        self.handler = ScreenshotHandler(self.config)
+        self.handler = ScreenshotHandler(self.config, self.processor, self.clipboard)
         self.observer = Observer()
         self.observer.schedule(self.handler, str(screenshot_folder), recursive=False)
         
@@ -585,25 +774,33 @@ class ScreenshotRounder:
         self.logger.info(f"✅ File system monitoring started")
         self.logger.info(f"🎯 Watching for patterns: {self.config.config.get('file_patterns', [])}")
         
-        # Start clipboard monitoring for Cmd+Shift+4 selections
-        if self.config.config.get('monitor_clipboard', True):
-            processor = ImageProcessor(self.config)
-            self.handler.clipboard.start_clipboard_monitoring(processor)
-        else:
-            self.logger.info("📴 Clipboard monitoring disabled in configuration")
-        
         try:
-            while True:
-                time.sleep(1)
+            # Poll the clipboard for Cmd+Shift+4 selections on this thread rather
+            # than a dedicated one; the pasteboard has no change notification, so
+            # this wakes every 0.5s until stop_monitoring() sets its stop event.
+            # Returns right away if the clipboard is unavailable
+            if self.config.config.get('monitor_clipboard', True):
+                self.clipboard.run_clipboard_monitoring(self.processor)
+            else:
+                self.logger.info("📴 Clipboard monitoring disabled in configuration")
+            
+            # Without clipboard polling there is nothing to do on this thread -
+            # block until the observer stops (Ctrl+C still interrupts the join)
+            # instead of waking every second
+            self.observer.join()
         except KeyboardInterrupt:
             self.logger.info(f"⏹️  Stopping screenshot monitoring...")
             self.stop_monitoring()
+        except SystemExit:
+            # SIGTERM from launchd - shut down cleanly, then keep exiting
+            self.logger.info(f"⏹️  Stopping screenshot monitoring...")
+            self.stop_monitoring()
+            raise
     
     def stop_monitoring(self):
         """Stop file system monitoring"""
         # Stop clipboard monitoring
-        if self.handler and self.handler.clipboard:
-            self.handler.clipboard.stop_clipboard_monitoring()
+        self.clipboard.stop_clipboard_monitoring()
         
         # Stop file system monitoring
         if self.observer:
@@ -611,6 +808,22 @@ class ScreenshotRounder:
             self.observer.join()
             self.logger.info(f"✅ File system monitoring stopped")
     
+    def process_image(self, img: Image.Image, name: str = "image.png") -> bool:
+        """Process an in-memory image, naming the output after name"""
+        self.logger.info(f"🔄 Processing in-memory image: {name}")
+        
+        _, png_bytes = self.processor.process_image(img, Path(name))
+        
+        if png_bytes:
+            if self.config.config.get('auto_copy_to_clipboard', True):
+                self.clipboard.copy_image_to_clipboard(png_bytes)
+            
+            self.logger.info(f"🎉 In-memory image processing completed: {name}")
+            return True
+        else:
+            self.logger.error(f"❌ Failed to process image: {name}")
+            return False
+    
     def process_single_file(self, file_path: str):
         """Process a single file manually"""
         path = Path(file_path).resolve()
@@ -621,14 +834,11 @@ class ScreenshotRounder:
         
         self.logger.info(f"🔄 Processing single file: {path.name}")
         
-        processor = ImageProcessor(self.config)
-        clipboard = ClipboardManager(self.config)
-        
-        output_path = processor.apply_rounded_corners(path)
+        _, png_bytes = self.processor.apply_rounded_corners(path)
         
-        if output_path:
+        if png_bytes:
             if self.config.config.get('auto_copy_to_clipboard', True):
-                clipboard.copy_image_to_clipboard(output_path)
+                self.clipboard.copy_image_to_clipboard(png_bytes)
             
             self.logger.info(f"🎉 Single file processing completed: {path.name}")
             return True
@@ -7,80 +7,349 @@ Creates necessary directories and installs dependencies
 import subprocess
 import sys
 import os
+import json
+import re
+import shlex
+import stat
+import site
+import importlib
+import sysconfig
 from pathlib import Path
 
 
-def run_command(command, description):
-    """Run a command and handle errors"""
-    print(f"🔄 {description}...")
+def _ascii_say(*args, **kwargs):
+    """print() with emoji stripped, for consoles that can't encode them"""
+    print(*(re.sub(r"[^\x00-\x7f]+ *", "", a) if isinstance(a, str) else a for a in args), **kwargs)
+
+
+# Lines of a failed command's log echoed back to the terminal
+LOG_TAIL_LINES = 20
+
+# Status output - emoji only when stdout can actually encode them
+_say = print if (sys.stdout.encoding or "").lower().replace("-", "").startswith("utf") else _ascii_say
+
+
+def run_command(command, description, env=None, output=None, log_fh=None):
+    """Run a command and handle errors
+
+    With `log_fh` (a file opened "a+b") the command writes straight into the
+    log; on failure the tail of its output is echoed, and if `output` is a
+    list the command's lines are appended to it. Without a log the command
+    shares this process's stdout.
+    """
+    _say(f"🔄 {description}...")
+    # No intermediate /bin/sh - exec the program directly
+    argv = shlex.split(command) if isinstance(command, str) else list(command)
     try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"✅ {description} completed successfully")
+        if log_fh is not None:
+            log_fh.write(f"\n$ {' '.join(map(shlex.quote, argv))}\n".encode())
+            log_fh.flush()
+            start = log_fh.tell()
+        
+        returncode = subprocess.run(
+            argv,
+            stdout=log_fh,
+            stderr=subprocess.STDOUT if log_fh is not None else None,
+            env=env
+        ).returncode
+        
+        lines = []
+        if log_fh is not None and (returncode != 0 or output is not None):
+            log_fh.seek(start)
+            lines = log_fh.read().decode(errors='replace').splitlines()
+            log_fh.seek(0, os.SEEK_END)
+            if output is not None:
+                output.extend(lines)
+        
+        if returncode == 0:
+            _say(f"✅ {description} completed successfully")
             return True
         else:
-            print(f"❌ {description} failed: {result.stderr}")
+            _say(f"❌ {description} failed (exit code {returncode})")
+            for line in lines[-LOG_TAIL_LINES:]:
+                sys.stdout.write(f"   {line}\n")
             return False
     except Exception as e:
-        print(f"❌ {description} failed: {e}")
+        _say(f"❌ {description} failed: {e}")
         return False
 
 
+def _needs_install(req_file):
+    """Return True unless every requirement is already installed and in spec"""
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+        from packaging.requirements import Requirement
+        from packaging.version import Version, InvalidVersion
+    except ImportError:
+        # No way to check without packaging - let pip decide
+        return True
+    
+    try:
+        lines = Path(req_file).read_text().splitlines()
+    except OSError:
+        return True
+    
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        
+        try:
+            req = Requirement(line)
+        except Exception:
+            return True
+        
+        if req.marker is not None and not req.marker.evaluate():
+            continue
+        
+        try:
+            installed = version(req.name)
+        except PackageNotFoundError:
+            return True
+        
+        try:
+            installed_version = Version(installed)
+        except InvalidVersion:
+            return True
+        
+        if not req.specifier.contains(installed_version, prereleases=True):
+            return True
+    
+    return False
+
+
+def _pip_install_argv(*flags):
+    """pip install argv routed through this interpreter"""
+    return [sys.executable, "-m", "pip", "install", *flags,
+            "-r", "requirements.txt", "--no-compile"]
+
+
+def _externally_managed():
+    """True if the distro marks this Python as externally managed (PEP 668)"""
+    return (Path(sysconfig.get_path('stdlib')) / 'EXTERNALLY-MANAGED').exists()
+
+
+def _select_pip_cmd():
+    """Pick the one pip install argv that fits this interpreter"""
+    # Inside a virtual environment --user installs are rejected
+    if sys.prefix != sys.base_prefix:
+        return _pip_install_argv()
+    
+    return _pip_install_argv("--user")
+
+
+# Distributions whose import name differs from the project name
+IMPORT_NAMES = {
+    'pillow': 'PIL',
+    'pyobjc-framework-cocoa': 'AppKit',
+    'pyobjc-framework-quartz': 'Quartz',
+}
+
+
+def _requirement_modules(req_file):
+    """Map each project in requirements.txt to its top-level import name"""
+    modules = []
+    for line in Path(req_file).read_text().splitlines():
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        
+        project = re.split(r"[\s\[<>=!~;]", line, maxsplit=1)[0]
+        modules.append((project, IMPORT_NAMES.get(project.lower(), project.replace('-', '_'))))
+    return modules
+
+
+def _refresh_sys_path():
+    """Make packages installed by this run visible to this interpreter"""
+    # Packages installed moments ago may live in a user site dir that did
+    # not exist when this interpreter started
+    user_site = site.getusersitepackages()
+    if os.path.isdir(user_site) and user_site not in sys.path:
+        site.addsitedir(user_site)
+    importlib.invalidate_caches()
+
+
+def _installed_package_dirs(req_file):
+    """Top-level package paths of the requirements and their dependencies"""
+    try:
+        from importlib.metadata import distribution, PackageNotFoundError
+    except ImportError:
+        # Python 3.7 - nothing to resolve against
+        return []
+    
+    _refresh_sys_path()
+    pending = [project for project, _ in _requirement_modules(req_file)]
+    seen = set()
+    paths = set()
+    while pending:
+        name = pending.pop()
+        key = re.sub(r"[-_.]+", "-", name).lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        
+        try:
+            dist = distribution(name)
+        except PackageNotFoundError:
+            continue
+        
+        for file in dist.files or ():
+            top = file.parts[0]
+            # Skip metadata and anything outside site-packages (scripts)
+            if top == '..' or top.endswith(('.dist-info', '.egg-info')):
+                continue
+            if len(file.parts) > 1 or top.endswith('.py'):
+                paths.add(str(dist.locate_file(top)))
+        
+        for requirement in dist.requires or ():
+            if 'extra ==' in requirement:
+                continue
+            pending.append(re.split(r"[\s\[<>=!~;(]", requirement, maxsplit=1)[0])
+    
+    return sorted(paths)
+
+
+def _check_config(config_file):
+    """Check config.json and the folders it points at, like `--test` does"""
+    config = {}
+    try:
+        with open(config_file) as f:
+            config = json.load(f)
+        _say(f"   ✅ Configuration loaded from {config_file}")
+    except FileNotFoundError:
+        _say(f"   ⚠️  {config_file} not found, defaults will be used")
+    except (OSError, ValueError) as e:
+        _say(f"   ❌ Could not read {config_file}: {e}")
+        return False
+    
+    screenshot_folder = Path(config.get('screenshot_folder', '~/Desktop')).expanduser()
+    if not screenshot_folder.is_dir():
+        _say(f"   ❌ Screenshot folder doesn't exist: {screenshot_folder}")
+        return False
+    _say(f"   ✅ Screenshot folder exists: {screenshot_folder}")
+    
+    if not config.get('replace_original', False):
+        output_folder = Path(config.get('output_folder', '~/Desktop/rounded_screenshots')).expanduser()
+        try:
+            output_folder.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            _say(f"   ❌ Output folder not usable: {output_folder} ({e})")
+            return False
+        _say(f"   ✅ Output folder ready: {output_folder}")
+    
+    return True
+
+
+def _run_self_test():
+    """Check that every dependency imports in this interpreter"""
+    _say(f"🔄 Testing setup...")
+    
+    _refresh_sys_path()
+    
+    ok = _check_config("config.json")
+    for project, module in _requirement_modules("requirements.txt"):
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            _say(f"   ❌ {project} ({module}): {e}")
+            ok = False
+        else:
+            _say(f"   ✅ {project} ({module})")
+    
+    if ok:
+        _say(f"✅ Testing setup completed successfully")
+    else:
+        _say(f"❌ Testing setup failed")
+    return ok
+
+
 def main():
     """Main setup function"""
-    print("🚀 Setting up Screenshot Rounder...")
+    _say("🚀 Setting up Screenshot Rounder...")
+    
+    # Dependencies already baked in (CI caches, container images)
+    skip_install = "--offline" in sys.argv or os.environ.get("SCREENSHOT_ROUNDER_SKIP_INSTALL", "").lower() in ("1", "true", "yes")
     
     # Create necessary directories
-    home = Path.home()
-    app_dir = home / '.screenshot_rounder'
-    logs_dir = app_dir / 'logs'
-    
-    print(f"📁 Creating directories...")
-    app_dir.mkdir(exist_ok=True)
-    logs_dir.mkdir(exist_ok=True)
-    print(f"✅ Directories created: {app_dir}")
-    
-    # Install Python dependencies
-    print(f"🔄 Installing Python dependencies...")
-    
-    # Try different installation methods
-    install_commands = [
-        "pip3 install --user -r requirements.txt",
-        "python3 -m pip install --user -r requirements.txt",
-        "pip3 install --break-system-packages -r requirements.txt"
-    ]
-    
-    success = False
-    for cmd in install_commands:
-        print(f"🔄 Trying: {cmd}")
-        if run_command(cmd, f"Installing with: {cmd.split()[0]}"):
-            success = True
-            break
-        print(f"⚠️  Command failed, trying next method...")
-    
-    if not success:
-        print("❌ Failed to install dependencies automatically.")
-        print("📋 Please install manually using one of these commands:")
-        print("   pip3 install --user -r requirements.txt")
-        print("   OR create a virtual environment:")
-        print("   python3 -m venv venv && source venv/bin/activate && pip install -r requirements.txt")
-        return False
+    logs_dir = os.path.expanduser("~/.screenshot_rounder/logs")
+    app_dir = os.path.dirname(logs_dir)
+    
+    _say(f"📁 Creating directories...")
+    os.makedirs(logs_dir, exist_ok=True)
+    _say(f"✅ Directories created: {app_dir}")
     
-    # Make script executable
-    if not run_command("chmod +x screenshot_rounder.py", "Making script executable"):
-        print("⚠️  Could not make script executable, but continuing...")
+    # Install Python dependencies - skip pip entirely when nothing is missing
+    if skip_install:
+        _say(f"⏭️  Skipping dependency install (--offline)")
+    elif not _needs_install("requirements.txt"):
+        _say(f"✅ Python dependencies already satisfied")
+    else:
+        _say(f"🔄 Installing Python dependencies...")
+        
+        # Reuse downloaded wheels across runs and skip pip's self-update
+        # check (an extra HTTP round-trip on every invocation)
+        pip_env = os.environ.copy()
+        pip_env["PIP_CACHE_DIR"] = os.path.join(app_dir, 'pip-cache')
+        pip_env["PIP_DISABLE_PIP_VERSION_CHECK"] = "1"
+        pip_env["PIP_NO_INPUT"] = "1"
+        
+        # Subprocess output goes straight to a log file instead of being
+        # buffered here; `tail -f` it to follow along
+        setup_log = os.path.join(logs_dir, 'setup.log')
+        _say(f"📝 Installer output is logged to {setup_log}")
+        with open(setup_log, 'a+b') as log_fh:
+            # One pip run through this interpreter; escalate only when PEP 668
+            # is what rejected it
+            cmd = _select_pip_cmd()
+            _say(f"🔄 Trying: {' '.join(map(shlex.quote, cmd))}")
+            pip_output = []
+            success = run_command(cmd, "Installing with pip", env=pip_env, output=pip_output, log_fh=log_fh)
+            
+            if (not success and "--user" in cmd and _externally_managed()
+                    and any("externally-managed-environment" in line for line in pip_output)):
+                cmd = _pip_install_argv("--user", "--break-system-packages")
+                _say(f"⚠️  Python is externally managed, retrying with --break-system-packages...")
+                _say(f"🔄 Trying: {' '.join(map(shlex.quote, cmd))}")
+                success = run_command(cmd, "Installing with pip", env=pip_env, log_fh=log_fh)
+            
+            if success:
+                # pip ran with --no-compile; byte-compile just the installed
+                # packages at once across all CPUs instead of file by file
+                # during install (Python compiles lazily if this is skipped)
+                targets = _installed_package_dirs("requirements.txt")
+                if targets:
+                    run_command([sys.executable, "-m", "compileall", "-j0", "-q", *targets],
+                                "Byte-compiling in parallel", log_fh=log_fh)
+        
+        if not success:
+            _say("❌ Failed to install dependencies automatically.")
+            _say("📋 Please install manually using one of these commands:")
+            _say("   pip3 install --user -r requirements.txt")
+            _say("   OR create a virtual environment:")
+            _say("   python3 -m venv venv && source venv/bin/activate && pip install -r requirements.txt")
+            return False
+    
+    # Make script executable (stat + chmod in-process, no fork/exec)
+    script = Path("screenshot_rounder.py")
+    try:
+        script.chmod(script.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        _say(f"✅ Making script executable completed successfully")
+    except OSError as e:
+        _say(f"⚠️  Could not make script executable ({e}), but continuing...")
     
     # Test the setup
-    if not run_command("python3 screenshot_rounder.py --test", "Testing setup"):
-        print("❌ Setup test failed")
+    if not _run_self_test():
+        _say("❌ Setup test failed")
         return False
     
-    print("🎉 Screenshot Rounder setup completed successfully!")
-    print("\n📋 Next steps:")
-    print("1. Run: python3 screenshot_rounder.py")
-    print("2. Take a screenshot (Cmd+Shift+3 or Cmd+Shift+4)")
-    print("3. Check your Desktop/rounded_screenshots folder")
-    print("4. The processed image should also be in your clipboard!")
+    _say("🎉 Screenshot Rounder setup completed successfully!")
+    _say("\n📋 Next steps:")
+    _say("1. Run: python3 screenshot_rounder.py")
+    _say("2. Take a screenshot (Cmd+Shift+3 or Cmd+Shift+4)")
+    _say("3. Check your Desktop/rounded_screenshots folder")
+    _say("4. The processed image should also be in your clipboard!")
+    _say("\n⏭️  Re-run with --offline (or SCREENSHOT_ROUNDER_SKIP_INSTALL=1) to skip the pip install step")
+    _say("🔍 For a full check of folders and permissions run: python3 screenshot_rounder.py --test")
     
     return True
 